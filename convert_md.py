@@ -2,13 +2,9 @@ import re
 import html
 import sys
 import os
-
-if len(sys.argv) < 3:
-    print("Usage: python convert_md.py <input_md_file> <output_html_file>")
-    sys.exit(1)
-
-INPUT_FILE = sys.argv[1]
-OUTPUT_FILE = sys.argv[2]
+import glob
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 
 HTML_HEADER = """<!DOCTYPE html>
 <html lang="en">
@@ -165,6 +161,14 @@ HTML_HEADER = """<!DOCTYPE html>
     <div class="container">
 """
 
+def _minify_css(m):
+    css = re.sub(r'/\*.*?\*/', '', m.group(0), flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    return re.sub(r' ?([{};:,]) ?', r'\1', css).strip()
+
+# The stylesheet goes into every output file, so shrink it once at import
+HTML_HEADER = re.sub(r'(?<=<style>).*?(?=</style>)', _minify_css, HTML_HEADER, flags=re.S)
+
 HTML_FOOTER = """
     </div>
     <!-- Scripts -->
@@ -174,154 +178,259 @@ HTML_FOOTER = """
 </html>
 """
 
+# Encoded once so every output file can skip the text codec for them
+HTML_HEADER_BYTES = HTML_HEADER.encode('utf-8')
+HTML_FOOTER_BYTES = HTML_FOOTER.encode('utf-8')
+
+# Inline patterns merged into one alternation so each line is scanned once:
+# bold italic, bold, italic, code, link (text, href). Bold italic (`***x***`)
+# comes first so its outer stars are not left unpaired by the bold match.
+# Italic may wrap a bold run but never closes on half of a `**`, so bold keeps
+# priority as with separate passes.
+# Bodies use negated character classes rather than lazy `.*?`, so each
+# alternative scans forward once instead of backtracking. Link text may hold
+# one level of balanced brackets, e.g. [arr[0]](u).
+_INLINE_RE = re.compile(
+    r'\*\*\*((?:[^*]|\*(?!\*))*)\*\*\*'
+    r'|\*\*((?:[^*]|\*(?!\*))*)\*\*'
+    r'|(?<!\*)\*(?!\*)((?:[^*]|\*\*(?:[^*]|\*(?!\*))*\*\*)*)\*(?!\*)'
+    r'|`([^`]*)`'
+    r'|\[((?:[^\[\]]|\[[^\[\]]*\])*)\]\(([^)]*)\)'
+)
+
+def _inline_repl(m):
+    g = m.lastindex
+    if g == 1:
+        return f"<strong><em>{format_inline(m.group(1))}</em></strong>"
+    if g == 2:
+        return f"<strong>{format_inline(m.group(2))}</strong>"
+    if g == 3:
+        return f"<em>{format_inline(m.group(3))}</em>"
+    if g == 4:
+        return f"<code>{m.group(4)}</code>"
+    return f'<a href="{m.group(6)}">{format_inline(m.group(5))}</a>'
+
+# Table cells and list items repeat a lot; cache the formatted result
+@lru_cache(maxsize=4096)
 def format_inline(text):
-    # Bold
-    text = re.sub(r'\*\*(.*?)\*\*', r'<strong>\1</strong>', text)
-    # Italic (careful not to match inside bold if possible, but basic is fine)
-    text = re.sub(r'(?<!\*)\*(?!\*)(.*?)\*', r'<em>\1</em>', text)
-    # Code
-    text = re.sub(r'`(.*?)`', r'<code>\1</code>', text)
-    # Links
-    text = re.sub(r'\[(.*?)\]\((.*?)\)', r'<a href="\2">\1</a>', text)
-    return text
-
-def render_table(rows):
-    if not rows: return ""
-    html_parts = ["<table>"]
-    
-    # Process header
-    header_row = rows[0]
-    cols = [c.strip() for c in header_row.strip("|").split("|")]
-    html_parts.append("<thead><tr>")
-    for c in cols:
+    """
+    >>> format_inline('***Note:*** text')
+    '<strong><em>Note:</em></strong> text'
+    >>> format_inline('**a** ***b***')
+    '<strong>a</strong> <strong><em>b</em></strong>'
+    >>> format_inline('* **S**: x')
+    '* <strong>S</strong>: x'
+    >>> format_inline('see [arr[0]](u)')
+    'see <a href="u">arr[0]</a>'
+    >>> format_inline('[a] and [b](u)')
+    '[a] and <a href="u">b</a>'
+    """
+    return _INLINE_RE.sub(_inline_repl, text)
+
+# Open block while converting. Tables are streamed row by row: the header
+# row opens the table (STATE_TABLE_HEAD), an optional separator row may follow
+# it, and every other row goes straight out (STATE_TABLE).
+STATE_NONE, STATE_CODE, STATE_TABLE_HEAD, STATE_TABLE, STATE_LIST = range(5)
+
+# Separator row under a table header, e.g. |---|:---:|
+_TABLE_SEP_RE = re.compile(r'\|?\s*:?-+:?\s*(?:\|\s*:?-+:?\s*)*\|?')
+
+# Markup that closes each state, indexed by state
+_CLOSE_TAGS = ("", "</code></pre>\n", "</tbody></table>\n", "</tbody></table>\n", "</ul>\n")
+
+def render_table_header(row):
+    html_parts = ["<table><thead><tr>"]
+    append = html_parts.append
+    for c in row.strip("|").split("|"):
+        c = c.strip()
         if not c: continue # Skip empty splits from ends
-        html_parts.append(f"<th>{format_inline(c)}</th>")
-    html_parts.append("</tr></thead>")
-    
-    # Determine data start (skip separator if present)
-    start_idx = 1
-    if len(rows) > 1 and "---" in rows[1]:
-        start_idx = 2
-        
-    html_parts.append("<tbody>")
-    for row in rows[start_idx:]:
-        cols = [c.strip() for c in row.strip("|").split("|")]
-        html_parts.append("<tr>")
-        for c in cols:
-            if not c and not row.strip().endswith("|"): continue # strict check?
-            # actually simpler: filter empty strings from split result if they are just artifacts
-            # But | val | val | splits to ['', 'val', 'val', '']
-            pass
-        
-        # Better split logic for table rows
-        clean_cols = [c.strip() for c in row.strip().strip("|").split("|")]
-        for c in clean_cols:
-             html_parts.append(f"<td>{format_inline(c)}</td>")
-        html_parts.append("</tr>")
-        
-    html_parts.append("</tbody></table>")
+        append(f"<th>{format_inline(c)}</th>")
+    append("</tr></thead><tbody>")
     return "".join(html_parts)
 
-def main():
+def render_table_row(row):
+    html_parts = ["<tr>"]
+    append = html_parts.append
+    fmt = format_inline
+    for c in row.strip("|").split("|"):
+        append(f"<td>{fmt(c.strip())}</td>")
+    append("</tr>")
+    return "".join(html_parts)
+
+# Opening tag for the default (and by far most common) code block language
+_JAVA_CODE_OPEN = '<pre><code class="language-java">\n'
+
+# Characters that need escaping in code block text (quotes are fine outside
+# attributes)
+_ESC_CHARS = frozenset('<>&')
+
+# Characters allowed on a horizontal rule line
+_HR_CHARS = frozenset('-* ')
+
+# Block-level line classifier, matched once per stripped line outside code
+# blocks. Groups only look at the prefix; the branches in convert_file() do
+# the rest.
+_LINE_RE = re.compile(
+    r'(?P<fence>```)'
+    r'|(?P<table>\|)'
+    r'|(?P<list>- )'
+    r'|(?P<header>#)'
+    r'|(?P<hr>---|\*\*\*)'
+)
+
+def convert_file(input_file, output_file):
     try:
-        with open(INPUT_FILE, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
+        with open(input_file, 'r', encoding='utf-8') as f:
+            # Split on newlines only; str.splitlines() would also break on
+            # form feeds, \x85, \u2028 and friends inside a line
+            lines = f.read().split("\n")
+        if lines[-1] == "":
+            lines.pop()
     except FileNotFoundError:
-        print(f"Error: {INPUT_FILE} not found.")
+        print(f"Error: {input_file} not found.")
         return
 
-    out = [HTML_HEADER]
-    
-    in_code_block = False
-    code_lang = ""
-    in_table = False
-    in_list = False
-    table_buffer = []
-    
-    for line in lines:
-        raw_line = line
-        stripped = line.strip()
-        
-        # Code Blocks
-        if stripped.startswith("```"):
-            if in_code_block:
-                out.append("</code></pre>")
-                in_code_block = False
-            else:
+    # Stream fragments straight to the output instead of joining them at the end.
+    # The header and footer go to f.buffer as pre-encoded bytes with plain \n
+    # line endings, so the text layer uses newline='\n' as well; otherwise
+    # Windows would write \r\n for the body only and mix line endings.
+    with open(output_file, 'w', encoding='utf-8', newline='\n', buffering=1 << 20) as f:
+        # Local names for everything the per-line loop calls
+        write = f.write
+        fmt = format_inline
+        escape = html.escape
+        is_plain = _ESC_CHARS.isdisjoint
+        match_line = _LINE_RE.match
+        render_row = render_table_row
+
+        f.buffer.write(HTML_HEADER_BYTES)
+        write("\n")
+
+        state = STATE_NONE
+
+        for line in lines:
+            raw_line = line
+            stripped = line.strip()
+
+            if state == STATE_CODE:
+                if stripped.startswith("```"):
+                    write("</code></pre>\n")
+                    state = STATE_NONE
+                    continue
+                # Escape HTML in code; most lines have nothing to escape
+                if is_plain(raw_line):
+                    write(raw_line)
+                else:
+                    write(escape(raw_line, quote=False))
+                write("\n")
+                continue
+
+            m = match_line(stripped)
+            kind = m.lastgroup if m else None
+
+            # Tables
+            if kind == "table":
+                if state == STATE_TABLE_HEAD and _TABLE_SEP_RE.fullmatch(stripped):
+                    # Separator under the header
+                    state = STATE_TABLE
+                elif state == STATE_TABLE_HEAD or state == STATE_TABLE:
+                    write(render_row(stripped))
+                    state = STATE_TABLE
+                else:
+                    if state: write(_CLOSE_TAGS[state])
+                    write(render_table_header(stripped))
+                    state = STATE_TABLE_HEAD
+                continue
+
+            # Lists
+            if kind == "list":
+                if state != STATE_LIST:
+                    if state: write(_CLOSE_TAGS[state])
+                    write("<ul>\n")
+                    state = STATE_LIST
+                write(f"<li>{fmt(stripped[2:])}</li>\n")
+                continue
+
+            # Any other line ends an open table or list
+            if state:
+                write(_CLOSE_TAGS[state])
+                state = STATE_NONE
+
+            # Code Blocks
+            if kind == "fence":
                 code_lang = stripped[3:].strip()
-                if not code_lang: code_lang = "java" # default
-                out.append(f'<pre><code class="language-{code_lang}">')
-                in_code_block = True
-            continue
-            
-        if in_code_block:
-            # Escape HTML in code
-            out.append(html.escape(raw_line))
-            continue
-            
-        # Tables
-        if stripped.startswith("|"):
-            if not in_table:
-                if table_buffer: # Flush previous if any (shouldn't happen)
-                    out.append(render_table(table_buffer))
-                    table_buffer = []
-                in_table = True
-            table_buffer.append(stripped)
-            continue
-        else:
-            if in_table:
-                out.append(render_table(table_buffer))
-                table_buffer = []
-                in_table = False
-        
-        # Lists
-        if stripped.startswith("- "):
-            if not in_list:
-                out.append("<ul>")
-                in_list = True
-            out.append(f"<li>{format_inline(stripped[2:])}</li>")
-            continue
-        else:
-            if in_list:
-                out.append("</ul>")
-                in_list = False
-                
-        # Headers
-        if stripped.startswith("#"):
-            level = 0
-            for char in stripped:
-                if char == '#': level += 1
-                else: break
-            
-            content = stripped[level:].strip()
-            out.append(f"<h{level}>{format_inline(content)}</h{level}>")
-            continue
-            
-        # HR
-        if stripped.startswith("---") or stripped.startswith("***"):
-            # Only if it's the whole line mostly
-            if len(stripped) >= 3 and all(c in "-* " for c in stripped):
-                out.append("<hr>")
+                if not code_lang or code_lang == "java": # default
+                    write(_JAVA_CODE_OPEN)
+                else:
+                    write(f'<pre><code class="language-{code_lang}">\n')
+                state = STATE_CODE
                 continue
-                
-        # Empty lines
-        if not stripped:
-            continue
-            
-        # Paragraphs
-        out.append(f"<p>{format_inline(stripped)}</p>")
-        
-    # Flush ends
-    if in_code_block: out.append("</code></pre>")
-    if in_list: out.append("</ul>")
-    if in_table: out.append(render_table(table_buffer))
-    
-    out.append(HTML_FOOTER)
-    
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        f.write("\n".join(out))
-    
-    print(f"Successfully converted {INPUT_FILE} to {OUTPUT_FILE}")
+
+            # Headers
+            if kind == "header":
+                content = stripped.lstrip('#')
+                level = len(stripped) - len(content)
+                if level > 6: level = 6 # HTML stops at <h6>
+                content = content.strip()
+                write(f"<h{level}>{fmt(content)}</h{level}>\n")
+                continue
+
+            # HR
+            if kind == "hr":
+                # Only if the whole line is rule characters (the prefix
+                # match already guarantees at least three)
+                if _HR_CHARS.issuperset(stripped):
+                    write("<hr>\n")
+                    continue
+
+            # Empty lines
+            if not stripped:
+                continue
+
+            # Paragraphs
+            write(f"<p>{fmt(stripped)}</p>\n")
+
+        # Flush ends
+        if state: write(_CLOSE_TAGS[state])
+
+        # Text writes are held in the wrapper until flushed; flush before every
+        # f.buffer write so the bytes land after the body, not before it
+        f.flush()
+        f.buffer.write(HTML_FOOTER_BYTES)
+
+    print(f"Successfully converted {input_file} to {output_file}")
+
+def convert_dir(input_dir, output_dir):
+    inputs = sorted(glob.glob(os.path.join(input_dir, "*.md")))
+    if not inputs:
+        print(f"Error: no .md files found in {input_dir}.")
+        return
+
+    if os.path.exists(output_dir) and not os.path.isdir(output_dir):
+        print(f"Error: {output_dir} exists and is not a directory.")
+        return
+
+    os.makedirs(output_dir, exist_ok=True)
+    outputs = [
+        os.path.join(output_dir, os.path.splitext(os.path.basename(path))[0] + ".html")
+        for path in inputs
+    ]
+
+    # Files share no state, so convert them across all cores
+    with ProcessPoolExecutor() as executor:
+        list(executor.map(convert_file, inputs, outputs))
+
+def main():
+    if len(sys.argv) < 3:
+        print("Usage: python convert_md.py <input_md_file> <output_html_file>")
+        print("       python convert_md.py <input_dir> <output_dir>")
+        sys.exit(1)
+
+    source, target = sys.argv[1], sys.argv[2]
+    if os.path.isdir(source):
+        convert_dir(source, target)
+    else:
+        convert_file(source, target)
 
 if __name__ == "__main__":
     main()